@@ -11,18 +11,20 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
+import json
 import os
+import re
 import warnings
 from argparse import Namespace
-from types import MethodType
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from copy import deepcopy
+from types import MappingProxyType, MethodType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, TYPE_CHECKING, Union
 
+import yaml
 from torch.optim import Optimizer
 
 from pytorch_lightning.callbacks import Callback
-from pytorch_lightning.core.datamodule import LightningDataModule
-from pytorch_lightning.core.lightning import LightningModule
-from pytorch_lightning.trainer.trainer import Trainer
 from pytorch_lightning.utilities import _module_available
 from pytorch_lightning.utilities.cloud_io import get_filesystem
 from pytorch_lightning.utilities.exceptions import MisconfigurationException
@@ -30,6 +32,17 @@ from pytorch_lightning.utilities.model_helpers import is_overridden
 from pytorch_lightning.utilities.seed import seed_everything
 from pytorch_lightning.utilities.types import LRSchedulerType, LRSchedulerTypeTuple
 
+if TYPE_CHECKING:
+    from pytorch_lightning.core.datamodule import LightningDataModule
+    from pytorch_lightning.core.lightning import LightningModule
+    from pytorch_lightning.trainer.trainer import Trainer
+
+# shared read-only fallback for missing `init_args`, avoids allocating a new dict on every lookup
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# use the libyaml C emitter when PyYAML was compiled with it
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 _JSONARGPARSE_AVAILABLE = _module_available("jsonargparse")
 if _JSONARGPARSE_AVAILABLE:
     from jsonargparse import ActionConfigFile, ArgumentParser, set_config_read_mode
@@ -38,9 +51,69 @@ else:
     ArgumentParser = object
 
 
+def _set_jsonargparse_yaml_backend() -> None:
+    """Makes jsonargparse dump yaml with ``_YAML_DUMPER``.
+
+    The loader is not replaced by a C based one because jsonargparse<4.5 also loads values which are not strings,
+    e.g. ``Enum`` members and ``Path`` objects, which only the pure-python loader accepts. Since 4.5 jsonargparse
+    itself loads with the C loader when available.
+
+    Values that look like json, i.e. config files in json format and the json given as command line values, are
+    loaded with the much faster ``json.loads``. Loaded values are also cached by content, so that config files
+    which get loaded again, e.g. the ``default_config_files`` which are read each time the defaults are requested,
+    are parsed only once.
+
+    Older versions of jsonargparse don't expose ``loaders_dumpers`` and always use the pure-python
+    ``yaml.safe_load`` and ``yaml.safe_dump``, in which case this is a no-op.
+    """
+    if not _module_available("jsonargparse.loaders_dumpers"):
+        return
+    from jsonargparse import loaders_dumpers
+
+    jsonargparse_yaml_load = loaders_dumpers.loaders['yaml']
+    # json is not exactly a subset of what PyYAML loads. The fast path is skipped for anything outside of printable
+    # ascii and line breaks: PyYAML folds or rejects some characters that `json.loads` keeps (e.g. NEL and DEL) and
+    # rejects tabs where json allows whitespace. Also for escaped utf-16 surrogates, which `json.loads` accepts unpaired
+    not_fast_json = re.compile(r'[^\x20-\x7e\n\r]|\\u[dD][89a-fA-F]')
+
+    def reject_constant(constant: str) -> Any:
+        # `json.loads` accepts NaN, Infinity and -Infinity, which the yaml loader keeps as strings
+        raise ValueError(f'{constant} is not valid json')
+
+    @functools.lru_cache(maxsize=32)
+    def yaml_load_cached(stream: str) -> Any:
+        # anything that `json.loads` could load differently from the yaml loader goes through the yaml loader
+        if stream.lstrip()[:1] in ('{', '[') and not not_fast_json.search(stream):
+            try:
+                return json.loads(stream, parse_constant=reject_constant)
+            except ValueError:
+                pass
+        return jsonargparse_yaml_load(stream)
+
+    def yaml_load(stream: str) -> Any:
+        # jsonargparse<4.5 also loads values that are not strings, e.g. `Enum` members and `Path` objects
+        if type(stream) is not str:
+            return jsonargparse_yaml_load(stream)
+        # jsonargparse modifies the loaded values, so each call gets its own copy
+        return deepcopy(yaml_load_cached(stream))
+
+    def yaml_dump(data: Any) -> str:
+        return yaml.dump(data, Dumper=_YAML_DUMPER, **loaders_dumpers.dump_yaml_kwargs)
+
+    loaders_dumpers.set_loader('yaml', yaml_load)
+    loaders_dumpers.set_dumper('yaml', yaml_dump)
+
+
+if _JSONARGPARSE_AVAILABLE:
+    _set_jsonargparse_yaml_backend()
+
+
 class LightningArgumentParser(ArgumentParser):
     """Extension of jsonargparse's ArgumentParser for pytorch-lightning"""
 
+    # parsed docstrings shared by all parsers, keyed by the documented objects and the function used to get the docs
+    _docstrings_cache: Dict[Tuple[Tuple[Any, ...], Callable], Tuple[Optional[str], Dict[str, str]]] = {}
+
     def __init__(self, *args: Any, parse_as_dict: bool = True, **kwargs: Any) -> None:
         """Initialize argument parser that supports configuration file input
 
@@ -61,7 +134,7 @@ class LightningArgumentParser(ArgumentParser):
 
     def add_lightning_class_args(
         self,
-        lightning_class: Union[Type[Trainer], Type[LightningModule], Type[LightningDataModule], Type[Callback]],
+        lightning_class: Union[Type['Trainer'], Type['LightningModule'], Type['LightningDataModule'], Type[Callback]],
         nested_key: str,
         subclass_mode: bool = False
     ) -> List[str]:
@@ -73,7 +146,17 @@ class LightningArgumentParser(ArgumentParser):
             nested_key: Name of the nested namespace to store arguments.
             subclass_mode: Whether allow any subclass of the given class.
         """
-        assert issubclass(lightning_class, (Trainer, LightningModule, LightningDataModule, Callback))
+        from pytorch_lightning.trainer.trainer import Trainer
+
+        if __debug__:
+            from pytorch_lightning.core.datamodule import LightningDataModule
+            from pytorch_lightning.core.lightning import LightningModule
+
+            if not issubclass(lightning_class, (Trainer, LightningModule, LightningDataModule, Callback)):
+                raise TypeError(
+                    '`lightning_class` should be a subclass of `Trainer`, `LightningModule`, `LightningDataModule` or'
+                    f' `Callback`, got {lightning_class}.'
+                )
         if issubclass(lightning_class, Callback):
             self.callback_keys.append(nested_key)
         if subclass_mode:
@@ -85,6 +168,21 @@ class LightningArgumentParser(ArgumentParser):
             instantiate=not issubclass(lightning_class, Trainer),
         )
 
+    if hasattr(ArgumentParser, '_gather_docstrings'):
+        # `_gather_docstrings` is a private jsonargparse API, removed in jsonargparse 4.10, which is why the supported
+        # versions are capped below it. Without it there is nothing to override and docstrings are not cached
+
+        def _gather_docstrings(
+            self, objects: List[Any], docs_func: Callable
+        ) -> Tuple[Optional[str], Dict[str, str]]:
+            # parsing docstrings is the most expensive part of adding class arguments and the same classes
+            # (e.g. the `Trainer`) are added every time a parser is built, so the results are reused
+            key = (tuple(objects), docs_func)
+            if key not in self._docstrings_cache:
+                self._docstrings_cache[key] = super()._gather_docstrings(objects, docs_func)
+            doc_group, doc_params = self._docstrings_cache[key]
+            return doc_group, dict(doc_params)
+
     def add_optimizer_args(
         self,
         optimizer_class: Union[Type[Optimizer], Tuple[Type[Optimizer], ...]],
@@ -147,6 +245,15 @@ class LightningArgumentParser(ArgumentParser):
 class SaveConfigCallback(Callback):
     """Saves a LightningCLI config to the log_dir when training starts
 
+    Args:
+        parser: The parser object used to parse the configuration.
+        config: The parsed configuration that will be saved.
+        config_filename: Filename for the config file.
+        overwrite: Whether to overwrite an existing config file.
+        multifile: When input is multiple config files, saved config preserves this structure.
+        skip_none: Whether to leave out the entries whose value is ``None``. This makes the saved file smaller, but
+            an explicit ``None`` that overrides a non-``None`` default is lost when the file is loaded again.
+
     Raises:
         RuntimeError: If the config file already exists in the directory to avoid overwriting a previous run
     """
@@ -157,13 +264,17 @@ class SaveConfigCallback(Callback):
         config: Union[Namespace, Dict[str, Any]],
         config_filename: str,
         overwrite: bool = False,
+        multifile: bool = False,
+        skip_none: bool = False,
     ) -> None:
         self.parser = parser
         self.config = config
         self.config_filename = config_filename
         self.overwrite = overwrite
+        self.multifile = multifile
+        self.skip_none = skip_none
 
-    def setup(self, trainer: Trainer, pl_module: LightningModule, stage: Optional[str] = None) -> None:
+    def setup(self, trainer: 'Trainer', pl_module: 'LightningModule', stage: Optional[str] = None) -> None:
         # save the config in `setup` because (1) we want it to save regardless of the trainer function run
         # and we want to save before processes are spawned
         log_dir = trainer.log_dir or trainer.default_root_dir
@@ -180,28 +291,46 @@ class SaveConfigCallback(Callback):
             # the `log_dir` needs to be created as we rely on the logger to do it usually
             # but it hasn't logged anything at this point
             get_filesystem(log_dir).makedirs(log_dir, exist_ok=True)
-            self.parser.save(self.config, config_path, skip_none=False, overwrite=self.overwrite)
+            # a single file is dumped in one pass, `multifile` needs an extra copy and walk of the config
+            self.parser.save(
+                self.config,
+                config_path,
+                skip_none=self.skip_none,
+                overwrite=self.overwrite,
+                multifile=self.multifile,
+            )
 
     def __reduce__(self) -> Tuple[Type['SaveConfigCallback'], Tuple, Dict]:
         # `ArgumentParser` is un-pickleable. Drop it
         return (
             self.__class__,
             (None, self.config, self.config_filename),
-            {},
+            {
+                'overwrite': self.overwrite,
+                'multifile': self.multifile,
+                'skip_none': self.skip_none
+            },
         )
 
 
 class LightningCLI:
     """Implementation of a configurable command line tool for pytorch-lightning"""
 
+    # Set to ``True`` in a subclass to reuse the parser of a previous instance created with the same classes and
+    # settings instead of building it again. Requires ``add_arguments_to_parser`` to always add the same arguments.
+    # The parsers are kept in ``_parsers_cache``, an unbounded dict shared by the whole process.
+    cache_parser: bool = False
+    _parsers_cache: Dict[Tuple[Any, ...], LightningArgumentParser] = {}
+
     def __init__(
         self,
-        model_class: Type[LightningModule],
-        datamodule_class: Type[LightningDataModule] = None,
+        model_class: Type['LightningModule'],
+        datamodule_class: Type['LightningDataModule'] = None,
         save_config_callback: Optional[Type[SaveConfigCallback]] = SaveConfigCallback,
         save_config_filename: str = 'config.yaml',
         save_config_overwrite: bool = False,
-        trainer_class: Type[Trainer] = Trainer,
+        save_config_multifile: bool = False,
+        trainer_class: Optional[Type['Trainer']] = None,
         trainer_defaults: Dict[str, Any] = None,
         seed_everything_default: int = None,
         description: str = 'pytorch-lightning trainer command line tool',
@@ -239,7 +368,9 @@ class LightningCLI:
             save_config_callback: A callback class to save the training config.
             save_config_filename: Filename for the config file.
             save_config_overwrite: Whether to overwrite an existing config file.
+            save_config_multifile: When input is multiple config files, saved config preserves this structure.
             trainer_class: An optional subclass of the :class:`~pytorch_lightning.trainer.trainer.Trainer` class.
+                Defaults to :class:`~pytorch_lightning.trainer.trainer.Trainer`.
             trainer_defaults: Set to override Trainer defaults or add persistent callbacks.
             seed_everything_default: Default value for the :func:`~pytorch_lightning.utilities.seed.seed_everything`
                 seed argument.
@@ -253,16 +384,33 @@ class LightningCLI:
             subclass_mode_data: Whether datamodule can be any `subclass
                 <https://jsonargparse.readthedocs.io/en/stable/#class-type-and-sub-classes>`_
                 of the given class.
+
+        Raises:
+            TypeError: If any of the given classes is not a subclass of the expected base class.
         """
-        assert issubclass(trainer_class, Trainer)
-        assert issubclass(model_class, LightningModule)
-        if datamodule_class is not None:
-            assert issubclass(datamodule_class, LightningDataModule)
+        if trainer_class is None:
+            from pytorch_lightning.trainer.trainer import Trainer
+            trainer_class = Trainer
+        if __debug__:
+            # the checks are skipped with `python -O`, together with the imports only they need
+            from pytorch_lightning.core.datamodule import LightningDataModule
+            from pytorch_lightning.core.lightning import LightningModule
+            from pytorch_lightning.trainer.trainer import Trainer
+
+            if not issubclass(trainer_class, Trainer):
+                raise TypeError(f'`trainer_class` should be a subclass of `Trainer`, got {trainer_class}.')
+            if not issubclass(model_class, LightningModule):
+                raise TypeError(f'`model_class` should be a subclass of `LightningModule`, got {model_class}.')
+            if datamodule_class is not None and not issubclass(datamodule_class, LightningDataModule):
+                raise TypeError(
+                    f'`datamodule_class` should be a subclass of `LightningDataModule`, got {datamodule_class}.'
+                )
         self.model_class = model_class
         self.datamodule_class = datamodule_class
         self.save_config_callback = save_config_callback
         self.save_config_filename = save_config_filename
         self.save_config_overwrite = save_config_overwrite
+        self.save_config_multifile = save_config_multifile
         self.trainer_class = trainer_class
         self.trainer_defaults = {} if trainer_defaults is None else trainer_defaults
         self.seed_everything_default = seed_everything_default
@@ -271,10 +419,7 @@ class LightningCLI:
         self.parser_kwargs = {} if parser_kwargs is None else parser_kwargs
         self.parser_kwargs.update({'description': description, 'env_prefix': env_prefix, 'default_env': env_parse})
 
-        self.init_parser()
-        self.add_core_arguments_to_parser()
-        self.add_arguments_to_parser(self.parser)
-        self.link_optimizers_and_lr_schedulers()
+        self.setup_parser()
         self.parse_arguments()
         if self.config['seed_everything'] is not None:
             seed_everything(self.config['seed_everything'], workers=True)
@@ -286,6 +431,43 @@ class LightningCLI:
         self.fit()
         self.after_fit()
 
+    def setup_parser(self) -> None:
+        """Builds the parser with all the arguments, or reuses a cached one if ``cache_parser`` is enabled"""
+        key = self._parser_cache_key() if self.cache_parser else None
+        if key is not None and key in self._parsers_cache:
+            self.parser = self._parsers_cache[key]
+            return
+        self.init_parser()
+        self.add_core_arguments_to_parser()
+        self.add_arguments_to_parser(self.parser)
+        self.link_optimizers_and_lr_schedulers()
+        if key is not None:
+            self._parsers_cache[key] = self.parser
+
+    def _parser_cache_key(self) -> Optional[Tuple[Any, ...]]:
+        # everything that the parser depends on. If something is not hashable, the parser is not cached
+        trainer_defaults = {k: v for k, v in self.trainer_defaults.items() if k != 'callbacks'}
+        key = (
+            type(self),
+            self.model_class,
+            self.datamodule_class,
+            self.trainer_class,
+            self.subclass_mode_model,
+            self.subclass_mode_data,
+            self.seed_everything_default,
+            _freeze(self.parser_kwargs),
+            _freeze(trainer_defaults),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            warnings.warn(
+                f'`{self.__class__.__name__}.cache_parser` is enabled but the parser will not be cached because'
+                ' some of `parser_kwargs` or `trainer_defaults` are not hashable.'
+            )
+            return None
+        return key
+
     def init_parser(self) -> None:
         """Method that instantiates the argument parser"""
         self.parser = LightningArgumentParser(**self.parser_kwargs)
@@ -339,21 +521,31 @@ class LightningCLI:
 
     def instantiate_trainer(self) -> None:
         """Instantiates the trainer using self.config_init['trainer']"""
-        if self.config_init['trainer'].get('callbacks') is None:
-            self.config_init['trainer']['callbacks'] = []
-        callbacks = [self.config_init[c] for c in self.parser.callback_keys]
-        self.config_init['trainer']['callbacks'].extend(callbacks)
+        # build new kwargs so that `self.config_init` is left untouched and this can be called again
+        trainer_kwargs = {**self.config_init['trainer']}
+        # `Trainer` accepts a single callback as well as a list of them
+        callbacks = trainer_kwargs.get('callbacks') or ()
+        callbacks = [callbacks] if isinstance(callbacks, Callback) else list(callbacks)
+        callbacks.extend(self.config_init[c] for c in self.parser.callback_keys)
         if 'callbacks' in self.trainer_defaults:
             if isinstance(self.trainer_defaults['callbacks'], list):
-                self.config_init['trainer']['callbacks'].extend(self.trainer_defaults['callbacks'])
+                callbacks.extend(self.trainer_defaults['callbacks'])
             else:
-                self.config_init['trainer']['callbacks'].append(self.trainer_defaults['callbacks'])
-        if self.save_config_callback and not self.config_init['trainer']['fast_dev_run']:
+                callbacks.append(self.trainer_defaults['callbacks'])
+        if (
+            self.save_config_callback and not trainer_kwargs['fast_dev_run']
+            and not any(isinstance(c, self.save_config_callback) for c in callbacks)
+        ):
             config_callback = self.save_config_callback(
-                self.parser, self.config, self.save_config_filename, overwrite=self.save_config_overwrite
+                self.parser,
+                self.config,
+                self.save_config_filename,
+                overwrite=self.save_config_overwrite,
+                multifile=self.save_config_multifile,
             )
-            self.config_init['trainer']['callbacks'].append(config_callback)
-        self.trainer = self.trainer_class(**self.config_init['trainer'])
+            callbacks.append(config_callback)
+        trainer_kwargs['callbacks'] = callbacks
+        self.trainer = self.trainer_class(**trainer_kwargs)
 
     def add_configure_optimizers_method_to_model(self) -> None:
         """
@@ -405,7 +597,7 @@ class LightningCLI:
                 lr_scheduler_init = _global_add_class_path(lr_scheduler_class, lr_scheduler_init)
 
         def configure_optimizers(
-            self: LightningModule
+            self: 'LightningModule'
         ) -> Union[Optimizer, Tuple[List[Optimizer], List[LRSchedulerType]]]:
             optimizer = instantiate_class(self.parameters(), optimizer_init)
             if not lr_scheduler_init:
@@ -432,6 +624,17 @@ class LightningCLI:
         """Implement to run some code after fit has finished"""
 
 
+def _freeze(value: Any) -> Any:
+    """Converts nested dicts, lists and sets into tuples and frozensets so that they can be hashed"""
+    if isinstance(value, dict):
+        return tuple(sorted(((k, _freeze(v)) for k, v in value.items()), key=lambda item: str(item[0])))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
 def _global_add_class_path(class_type: Type, init_args: Dict[str, Any]) -> Dict[str, Any]:
     return {
         'class_path': class_type.__module__ + '.' + class_type.__name__,
@@ -457,7 +660,7 @@ def instantiate_class(args: Union[Any, Tuple[Any, ...]], init: Dict[str, Any]) -
     Returns:
         The instantiated class object.
     """
-    kwargs = init.get('init_args', {})
+    kwargs = init.get('init_args') or _EMPTY
     if not isinstance(args, tuple):
         args = (args, )
     class_module, class_name = init['class_path'].rsplit('.', 1)
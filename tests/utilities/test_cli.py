@@ -19,6 +19,7 @@ import pickle
 import sys
 from argparse import Namespace
 from contextlib import redirect_stdout
+from enum import Enum
 from io import StringIO
 from typing import List, Optional
 from unittest import mock
@@ -32,8 +33,14 @@ from pytorch_lightning import LightningDataModule, LightningModule, Trainer
 from pytorch_lightning.callbacks import LearningRateMonitor, ModelCheckpoint
 from pytorch_lightning.plugins.environments import SLURMEnvironment
 from pytorch_lightning.utilities import _TPU_AVAILABLE
-from pytorch_lightning.utilities.cli import instantiate_class, LightningArgumentParser, LightningCLI, SaveConfigCallback
-from pytorch_lightning.utilities.imports import _TORCHVISION_AVAILABLE
+from pytorch_lightning.utilities.cli import (
+    ArgumentParser,
+    instantiate_class,
+    LightningArgumentParser,
+    LightningCLI,
+    SaveConfigCallback,
+)
+from pytorch_lightning.utilities.imports import _module_available, _TORCHVISION_AVAILABLE
 from tests.helpers import BoringDataModule, BoringModel
 from tests.helpers.runif import RunIf
 
@@ -290,6 +297,19 @@ def test_lightning_cli_args_callbacks(tmpdir):
     assert cli.trainer.ran_asserts
 
 
+def test_lightning_cli_single_arg_callback():
+    callback = dict(
+        class_path='pytorch_lightning.callbacks.LearningRateMonitor', init_args=dict(logging_interval='epoch')
+    )
+
+    with mock.patch('sys.argv', ['any.py', f'--trainer.callbacks={json.dumps(callback)}']), \
+            mock.patch.object(LightningCLI, 'fit'):
+        cli = LightningCLI(BoringModel, trainer_defaults={'callbacks': LearningRateMonitor()})
+
+    callbacks = [c for c in cli.trainer.callbacks if isinstance(c, LearningRateMonitor)]
+    assert [c.logging_interval for c in callbacks] == ['epoch', None]
+
+
 def test_lightning_cli_configurable_callbacks(tmpdir):
 
     class MyLightningCLI(LightningCLI):
@@ -771,3 +791,219 @@ def test_lightning_cli_optimizers_and_lr_scheduler_with_link_to(tmpdir):
     assert isinstance(cli.model.optim1, torch.optim.Adam)
     assert isinstance(cli.model.optim2, torch.optim.SGD)
     assert isinstance(cli.model.scheduler, torch.optim.lr_scheduler.ExponentialLR)
+
+
+@pytest.mark.skipif(not _module_available('jsonargparse.loaders_dumpers'), reason='jsonargparse>=4.2 required')
+def test_lightning_cli_yaml_backend():
+    from jsonargparse import loaders_dumpers
+
+    assert loaders_dumpers.loaders['yaml']('a: 1e3') == {'a': 1000.0}
+    assert yaml.safe_load(loaders_dumpers.dumpers['yaml']({'a': [1, 2], 'b': None})) == {'a': [1, 2], 'b': None}
+
+
+class Mode(str, Enum):
+    a = 'a'
+    b = 'b'
+
+
+def test_lightning_cli_enum_argument():
+
+    class EnumModel(BoringModel):
+
+        def __init__(self, mode: Mode = Mode.a):
+            super().__init__()
+            self.mode = mode
+
+    with mock.patch('sys.argv', ['any.py', '--model.mode=b']), mock.patch.object(LightningCLI, 'fit'):
+        cli = LightningCLI(EnumModel)
+
+    assert cli.model.mode == Mode.b
+
+
+@pytest.mark.skipif(
+    not hasattr(ArgumentParser, '_gather_docstrings'), reason='private jsonargparse API removed in jsonargparse 4.10'
+)
+def test_lightning_argument_parser_docstrings_cache():
+    LightningArgumentParser._docstrings_cache.clear()
+    parser = LightningArgumentParser(add_help=False)
+    parser.add_lightning_class_args(Trainer, 'trainer')
+    help_str = parser.format_help()
+    assert any(Trainer in objects for objects, _ in LightningArgumentParser._docstrings_cache)
+
+    with mock.patch('docstring_parser.parse') as parse_mock:
+        parser = LightningArgumentParser(add_help=False)
+        parser.add_lightning_class_args(Trainer, 'trainer')
+    parse_mock.assert_not_called()
+    assert parser.format_help() == help_str
+
+
+@pytest.mark.parametrize('multifile', (False, True))
+def test_save_config_callback_multifile(tmpdir, multifile):
+    trainer_defaults = {'default_root_dir': str(tmpdir), 'logger': False, 'max_steps': 1, 'max_epochs': 1}
+
+    with mock.patch('sys.argv', ['any.py']), mock.patch.object(LightningArgumentParser, 'save') as save_mock:
+        LightningCLI(BoringModel, save_config_multifile=multifile, trainer_defaults=trainer_defaults)
+
+    save_mock.assert_called_once()
+    assert save_mock.call_args[1]['multifile'] is multifile
+
+
+def test_lightning_cli_instantiate_trainer_twice(tmpdir):
+    trainer_defaults = {'default_root_dir': str(tmpdir), 'max_epochs': 1, 'callbacks': [LearningRateMonitor()]}
+
+    with mock.patch('sys.argv', ['any.py']), mock.patch.object(LightningCLI, 'fit'):
+        cli = LightningCLI(BoringModel, trainer_defaults=trainer_defaults)
+    num_callbacks = len(cli.trainer.callbacks)
+
+    cli.instantiate_trainer()
+    assert len(cli.trainer.callbacks) == num_callbacks
+    assert cli.config_init['trainer']['callbacks'] is None
+    assert len(trainer_defaults['callbacks']) == 1
+
+
+@pytest.mark.parametrize(
+    'init', (dict(class_path='torch.optim.Adam'), dict(class_path='torch.optim.Adam', init_args=None))
+)
+def test_instantiate_class_without_init_args(init):
+    optimizer = instantiate_class(BoringModel().parameters(), init)
+    assert isinstance(optimizer, torch.optim.Adam)
+
+
+@pytest.mark.skipif(not _module_available('jsonargparse.loaders_dumpers'), reason='jsonargparse>=4.2 required')
+def test_lightning_cli_yaml_load_cache():
+    from jsonargparse import loaders_dumpers
+
+    content = 'a: 1\nb: test_lightning_cli_yaml_load_cache\n'
+    with mock.patch('yaml.load', wraps=yaml.load) as load_mock:
+        first = loaders_dumpers.loaders['yaml'](content)
+        first['a'] = 2
+        second = loaders_dumpers.loaders['yaml'](content)
+    assert load_mock.call_count == 1
+    assert second == {'a': 1, 'b': 'test_lightning_cli_yaml_load_cache'}
+
+
+@pytest.mark.parametrize(
+    'kwargs', (
+        dict(model_class=Trainer),
+        dict(model_class=BoringModel, datamodule_class=BoringModel),
+        dict(model_class=BoringModel, trainer_class=BoringModel),
+    )
+)
+def test_lightning_cli_wrong_class_types(kwargs):
+    with mock.patch('sys.argv', ['any.py']), pytest.raises(TypeError, match='should be a subclass of'):
+        LightningCLI(**kwargs)
+
+
+def test_lightning_argument_parser_wrong_class_type():
+    parser = LightningArgumentParser()
+    with pytest.raises(TypeError, match='`lightning_class` should be a subclass of'):
+        parser.add_lightning_class_args(torch.nn.Linear, 'linear')
+
+
+@pytest.mark.skipif(not _module_available('jsonargparse.loaders_dumpers'), reason='jsonargparse>=4.2 required')
+@pytest.mark.parametrize(
+    ['value', 'expected'],
+    [
+        ('{"a": [1, 2.5], "b": null}', {'a': [1, 2.5], 'b': None}),
+        ('  [0, 2]', [0, 2]),
+        ('{a: 1, b: [x]}', {'a': 1, 'b': ['x']}),
+        ('{a,b}', '{a,b}'),
+        ('[NaN]', ['NaN']),
+        ('{"a": -Infinity}', {'a': '-Infinity'}),
+        ('["a\x85b"]', ['a b']),
+    ],
+)
+def test_lightning_cli_yaml_load_json(value, expected):
+    from jsonargparse import loaders_dumpers
+
+    assert loaders_dumpers.loaders['yaml'](value) == expected
+
+
+@pytest.mark.skipif(not _module_available('jsonargparse.loaders_dumpers'), reason='jsonargparse>=4.2 required')
+@pytest.mark.parametrize('value', ['["\x7f"]', '\n\t{"a": 1}'])
+def test_lightning_cli_yaml_load_json_invalid_yaml(value):
+    from jsonargparse import loaders_dumpers
+
+    with pytest.raises(yaml.YAMLError):
+        loaders_dumpers.loaders['yaml'](value)
+
+
+def test_lightning_cli_cache_parser(tmpdir):
+
+    class CachedLightningCLI(LightningCLI):
+        cache_parser = True
+
+    trainer_defaults = {'default_root_dir': str(tmpdir), 'max_epochs': 1}
+    with mock.patch('sys.argv', ['any.py']), mock.patch.object(LightningCLI, 'fit'):
+        cli1 = CachedLightningCLI(BoringModel, trainer_defaults=trainer_defaults)
+        cli2 = CachedLightningCLI(BoringModel, trainer_defaults=trainer_defaults)
+        cli3 = CachedLightningCLI(BoringModel, trainer_defaults={**trainer_defaults, 'max_epochs': 2})
+        cli4 = LightningCLI(BoringModel, trainer_defaults=trainer_defaults)
+
+    assert cli1.parser is cli2.parser
+    assert cli1.parser is not cli3.parser
+    assert cli3.trainer.max_epochs == 2
+    assert cli1.parser is not cli4.parser
+
+    config_path = tmpdir / 'defaults.yaml'
+    config_path.write_text('trainer:\n  max_epochs: 3\n', 'utf-8')
+    parser_kwargs = {'default_config_files': [str(config_path)]}
+    with mock.patch('sys.argv', ['any.py']), mock.patch.object(LightningCLI, 'fit'):
+        cli5 = CachedLightningCLI(BoringModel, trainer_defaults=trainer_defaults, parser_kwargs=dict(parser_kwargs))
+        cli6 = CachedLightningCLI(BoringModel, trainer_defaults=trainer_defaults, parser_kwargs=dict(parser_kwargs))
+    assert cli5.parser is cli6.parser
+    assert cli6.trainer.max_epochs == 3
+
+    # values that can't be hashed disable the cache with a warning
+    cli = object.__new__(CachedLightningCLI)
+    cli.__dict__.update(cli1.__dict__)
+    cli.parser_kwargs = {**cli1.parser_kwargs, 'unhashable': bytearray()}
+    with pytest.warns(UserWarning, match='parser will not be cached'):
+        assert cli._parser_cache_key() is None
+
+
+def test_lightning_cli_save_config_callback_not_duplicated(tmpdir):
+    with mock.patch('sys.argv', ['any.py']), mock.patch.object(LightningCLI, 'fit'):
+        cli = LightningCLI(BoringModel, trainer_defaults={'default_root_dir': str(tmpdir), 'max_epochs': 1})
+        config_callback = SaveConfigCallback(cli.parser, cli.config, 'other.yaml')
+        cli = LightningCLI(
+            BoringModel, trainer_defaults={
+                'default_root_dir': str(tmpdir),
+                'max_epochs': 1,
+                'callbacks': config_callback
+            }
+        )
+
+    callbacks = [c for c in cli.trainer.callbacks if isinstance(c, SaveConfigCallback)]
+    assert callbacks == [config_callback]
+
+
+def test_save_config_callback_pickle():
+    callback = SaveConfigCallback(
+        LightningArgumentParser(), {'a': 1}, 'other.yaml', overwrite=True, multifile=True, skip_none=True
+    )
+    callback = pickle.loads(pickle.dumps(callback))
+    assert callback.parser is None
+    assert callback.config == {'a': 1}
+    assert callback.config_filename == 'other.yaml'
+    assert callback.overwrite is True
+    assert callback.multifile is True
+    assert callback.skip_none is True
+
+
+@pytest.mark.parametrize('skip_none', (False, True))
+def test_save_config_callback_skip_none(tmpdir, skip_none):
+
+    class MySaveConfigCallback(SaveConfigCallback):
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, skip_none=skip_none, **kwargs)
+
+    cli_args = [f'--trainer.default_root_dir={tmpdir}', '--trainer.logger=False', '--trainer.max_epochs=1']
+    with mock.patch('sys.argv', ['any.py'] + cli_args):
+        cli = LightningCLI(BoringModel, save_config_callback=MySaveConfigCallback)
+
+    with open(tmpdir / 'config.yaml') as f:
+        config = yaml.safe_load(f.read())
+    assert cli.config['trainer']['max_steps'] is None
+    assert ('max_steps' in config['trainer']) is not skip_none